@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Template Bundler
+
+Bakes the files in templates/ into utils/_templates.py so the generator can
+serve them from memory instead of reading each one from disk at runtime.
+
+Run this again after editing any template; pass --check to verify that the
+bundle is up to date without rewriting it.
+"""
+
+import sys
+from pathlib import Path
+
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+BUNDLE_PATH = Path(__file__).parent / "utils" / "_templates.py"
+
+HEADER = '''"""
+Bundled templates for the microservice generator.
+
+Generated by build_templates.py from the templates/ directory. Do not edit
+by hand; edit the template files and rebuild instead.
+"""
+
+'''
+
+
+def build_bundle(template_dir: Path) -> str:
+    """
+    Build the source of the bundled templates module.
+
+    Args:
+        template_dir: The directory containing the .tmpl files
+
+    Returns:
+        The Python source defining the TEMPLATES mapping
+    """
+    lines = [HEADER, "TEMPLATES = {\n"]
+    for template_path in sorted(template_dir.glob("*.tmpl")):
+        source = template_path.read_text(encoding="utf-8")
+        lines.append(f"    {template_path.name!r}: {source!r},\n")
+    lines.append("}\n")
+    return "".join(lines)
+
+
+def main():
+    """Main entry point for the template bundler."""
+    bundle = build_bundle(TEMPLATE_DIR)
+    
+    if "--check" in sys.argv[1:]:
+        current = BUNDLE_PATH.read_text(encoding="utf-8") if BUNDLE_PATH.exists() else None
+        if current != bundle:
+            print(f"Error: {BUNDLE_PATH} is out of date; run python build_templates.py")
+            sys.exit(1)
+        print(f"{BUNDLE_PATH} is up to date")
+        return
+    
+    BUNDLE_PATH.write_text(bundle, encoding="utf-8")
+    print(f"Bundled templates into {BUNDLE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
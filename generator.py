@@ -5,130 +5,28 @@ Core generator logic for scaffolding new microservices.
 """
 
 import os
+import shlex
 import shutil
 import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional, Tuple
 
-from utils.file_utils import render_template, ensure_directory, write_file
+# dulwich is used to initialize git repositories in-process
+try:
+    from dulwich import porcelain
+    HAS_DULWICH = True
+except ImportError:
+    HAS_DULWICH = False
 
+from utils.file_utils import BUNDLED_TEMPLATE_DIR, HAS_LIBURING, load_template, ensure_directory, write_file, write_file_bytes, write_files
 
-class MicroserviceGenerator:
-    """Generator for creating new microservices from templates."""
+# README written into every generated service, filled from the template variables
+_README_TMPL = """# {service_name_capitalized} Service
 
-    def __init__(
-        self,
-        service_name: str,
-        output_dir: Path,
-        skip_git: bool = False,
-        verbose: bool = False
-    ):
-        self.service_name = service_name
-        self.output_dir = output_dir
-        self.skip_git = skip_git
-        self.verbose = verbose
-        
-        # Compute paths
-        self.service_dir = output_dir / service_name
-        self.template_dir = Path(__file__).parent / "templates"
-        
-        # Template variables
-        self.vars = {
-            "service_name": service_name,
-            "service_name_uppercase": service_name.upper(),
-            "service_name_capitalized": service_name.capitalize(),
-        }
-        
-        if self.verbose:
-            print(f"Service name: {service_name}")
-            print(f"Output directory: {output_dir}")
-            print(f"Service directory: {self.service_dir}")
-            print(f"Template directory: {self.template_dir}")
-
-    def generate(self):
-        """Generate the full microservice structure."""
-        self._create_directory_structure()
-        self._generate_files()
-        
-        if not self.skip_git:
-            self._initialize_git()
-
-    def _create_directory_structure(self):
-        """Create the directory structure for the microservice."""
-        if self.verbose:
-            print("Creating directory structure...")
-            
-        # Main directories
-        dirs = [
-            "src/data-access",
-            "src/models",
-            "src/routes",
-            "src/schemas",
-            "src/utils",
-            "src/db/migrations",
-            "src/plugins",
-            "docs",
-            "scripts"
-        ]
-        
-        for dir_path in dirs:
-            full_path = self.service_dir / dir_path
-            ensure_directory(full_path)
-            if self.verbose:
-                print(f"Created directory: {full_path}")
-
-    def _generate_files(self):
-        """Generate all the required files from templates."""
-        if self.verbose:
-            print("Generating files from templates...")
-            
-        # Root files
-        self._generate_file(".gitignore", "gitignore.tmpl")
-        self._generate_file("tsconfig.json", "tsconfig.json.tmpl")
-        self._generate_file("package.json", "package.json.tmpl")
-        self._generate_file("Dockerfile", "Dockerfile.tmpl")
-        self._generate_file(".env.example", "env.example.tmpl")
-        
-        # Source files
-        self._generate_file("src/app.ts", "app.ts.tmpl")
-        self._generate_file("src/config.ts", "config.ts.tmpl")
-        self._generate_file("src/utils/errorHandler.ts", "errorHandler.ts.tmpl")
-        self._generate_file("src/utils/sanitizer.ts", "sanitizer.ts.tmpl")
-        self._generate_file("src/plugins/index.ts", "plugins.ts.tmpl")
-        self._generate_file("src/routes/index.ts", "routes-index.ts.tmpl")
-        self._generate_file("src/routes/health.ts", "health-routes.ts.tmpl")
-        
-        # DB Migration files
-        self._generate_file("src/db/migrate.ts", "migrate.ts.tmpl")
-        self._generate_file("src/db/migrations/001_initial_schema.sql", "001_initial_schema.sql.tmpl")
-        
-        # Create a simple README for the service
-        self._generate_readme()
-    
-    def _generate_file(self, relative_path: str, template_name: str):
-        """Generate a single file from a template."""
-        target_path = self.service_dir / relative_path
-        template_path = self.template_dir / template_name
-        
-        # Ensure the directory exists
-        ensure_directory(target_path.parent)
-        
-        try:
-            # Render the template and write to the target path
-            content = render_template(template_path, self.vars)
-            write_file(target_path, content)
-            
-            if self.verbose:
-                print(f"Generated file: {target_path}")
-        except Exception as e:
-            print(f"Error generating file {target_path}: {e}")
-            raise
-    
-    def _generate_readme(self):
-        """Generate a README.md file for the service."""
-        content = f"""# {self.service_name.capitalize()} Service
-
-A microservice for the Fairytale Realm platform that handles {self.service_name} functionality.
+A microservice for the Fairytale Realm platform that handles {service_name} functionality.
 
 ## Features
 
@@ -181,53 +79,257 @@ A microservice for the Fairytale Realm platform that handles {self.service_name}
 Build and deploy with Docker:
 
 ```bash
-docker build -t {self.service_name}-service .
-docker run -p 3000:3000 {self.service_name}-service
+docker build -t {service_name}-service .
+docker run -p 3000:3000 {service_name}-service
 ```
 """
+
+
+class MicroserviceGenerator:
+    """Generator for creating new microservices from templates."""
+
+    # Files to generate, as (relative target path, template name) pairs
+    _TEMPLATES: Tuple[Tuple[str, str], ...] = (
+        # Root files
+        (".gitignore", "gitignore.tmpl"),
+        ("tsconfig.json", "tsconfig.json.tmpl"),
+        ("package.json", "package.json.tmpl"),
+        ("Dockerfile", "Dockerfile.tmpl"),
+        (".env.example", "env.example.tmpl"),
+        
+        # Source files
+        ("src/app.ts", "app.ts.tmpl"),
+        ("src/config.ts", "config.ts.tmpl"),
+        ("src/utils/errorHandler.ts", "errorHandler.ts.tmpl"),
+        ("src/utils/sanitizer.ts", "sanitizer.ts.tmpl"),
+        ("src/plugins/index.ts", "plugins.ts.tmpl"),
+        ("src/routes/index.ts", "routes-index.ts.tmpl"),
+        ("src/routes/health.ts", "health-routes.ts.tmpl"),
+        
+        # DB Migration files
+        ("src/db/migrate.ts", "migrate.ts.tmpl"),
+        ("src/db/migrations/001_initial_schema.sql", "001_initial_schema.sql.tmpl"),
+    )
+    
+    # Directories to create, relative to the service directory
+    _DIRECTORIES: Tuple[str, ...] = (
+        "src/data-access",
+        "src/models",
+        "src/routes",
+        "src/schemas",
+        "src/utils",
+        "src/db/migrations",
+        "src/plugins",
+        "docs",
+        "scripts",
+    )
+    
+    # Number of threads used to render and write files concurrently
+    _MAX_WORKERS = 8
+
+    def __init__(
+        self,
+        service_name: str,
+        output_dir: Path,
+        skip_git: bool = False,
+        verbose: bool = False
+    ):
+        self.service_name = service_name
+        self.output_dir = output_dir
+        self.skip_git = skip_git
+        self.verbose = verbose
+        
+        # Compute paths
+        self.service_dir = output_dir / service_name
+        self._service_dir_str = str(self.service_dir)
+        self.template_dir = BUNDLED_TEMPLATE_DIR
+        
+        # Template variables, computed once and shared read-only by every render
+        self.vars = MappingProxyType({
+            "service_name": service_name,
+            "service_name_uppercase": service_name.upper(),
+            "service_name_capitalized": service_name.capitalize(),
+        })
+        
+        # Verbose messages waiting to be written
+        self._log: List[str] = []
+        
+        self._vlog(f"Service name: {service_name}")
+        self._vlog(f"Output directory: {output_dir}")
+        self._vlog(f"Service directory: {self.service_dir}")
+        self._vlog(f"Template directory: {self.template_dir}")
+        self._flush_log()
+
+    def generate(self):
+        """Generate the full microservice structure."""
+        try:
+            self._create_directory_structure()
+            self._generate_files()
+            
+            if not self.skip_git:
+                self._initialize_git()
+        finally:
+            # Don't lose queued messages if a phase fails part-way
+            self._flush_log()
+
+    def _create_directory_structure(self):
+        """Create the directory structure for the microservice."""
+        self._vlog("Creating directory structure...")
+            
+        # Every directory that must exist, including the parents of generated files
+        candidates = [self.service_dir / dir_path for dir_path in self._DIRECTORIES]
+        candidates += [(self.service_dir / relative_path).parent for relative_path, _ in self._TEMPLATES]
+        
+        # Creating only the deepest paths also creates all of their ancestors
+        leaves = [
+            path for path in dict.fromkeys(candidates)
+            if not any(path in other.parents for other in candidates)
+        ]
+        
+        for full_path in leaves:
+            ensure_directory(full_path)
+            self._vlog(f"Created directory: {full_path}")
+        
+        self._flush_log()
+
+    def _generate_files(self):
+        """Generate all the required files from templates."""
+        self._vlog("Generating files from templates...")
+            
+        # Compile every template up front so the loop below only renders
+        compiled = [
+            (os.path.join(self._service_dir_str, relative_path), load_template(self.template_dir / template_name))
+            for relative_path, template_name in self._TEMPLATES
+        ]
+        
+        if HAS_LIBURING:
+            # Submit every write to the kernel in one io_uring batch
+            self._write_batched(compiled)
+        else:
+            # Files are independent, so render and write them concurrently
+            self._write_concurrently(compiled)
+        
+        # Create a simple README for the service
+        self._generate_readme()
+        
+        self._flush_log()
+    
+    def _write_concurrently(self, compiled: List[Tuple[str, Any]]) -> None:
+        """Render and write every compiled template on worker threads."""
+        with ThreadPoolExecutor(max_workers=self._MAX_WORKERS) as executor:
+            futures = [
+                (target_path, executor.submit(self._render_and_write, target_path, template))
+                for target_path, template in compiled
+            ]
+            
+            # Collect results in _TEMPLATES order so messages stay deterministic
+            for target_path, future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    self._flush_log()
+                    print(f"Error generating file {target_path}: {e}")
+                    raise
+                
+                self._vlog(f"Generated file: {target_path}")
+    
+    def _write_batched(self, compiled: List[Tuple[str, Any]]) -> None:
+        """Render every compiled template, then write them all in one batch."""
+        rendered = []
+        for target_path, template in compiled:
+            try:
+                rendered.append((target_path, template.render(self.vars).encode('utf-8')))
+            except Exception as e:
+                self._flush_log()
+                print(f"Error generating file {target_path}: {e}")
+                raise
+        
+        try:
+            # _create_directory_structure already created every parent directory
+            write_files(rendered, create_parents=False)
+        except OSError as e:
+            # Every file before the one that failed was written
+            paths = [str(target_path) for target_path, _ in rendered]
+            failed = paths.index(str(e.filename)) if str(e.filename) in paths else 0
+            for target_path in paths[:failed]:
+                self._vlog(f"Generated file: {target_path}")
+            
+            self._flush_log()
+            print(f"Error generating file {e.filename or paths[failed]}: {e}")
+            raise
+        
+        for target_path, _ in rendered:
+            self._vlog(f"Generated file: {target_path}")
+    
+    def _render_and_write(self, target_path: str, template: Any) -> None:
+        """Render a single compiled template and write it to the target path."""
+        # _create_directory_structure already created every parent directory
+        write_file_bytes(target_path, template.render(self.vars).encode('utf-8'), create_parents=False)
+    
+    def _generate_readme(self):
+        """Generate a README.md file for the service."""
+        content = _README_TMPL.format_map(self.vars)
         
         target_path = self.service_dir / "README.md"
-        write_file(target_path, content)
+        write_file(target_path, content, create_parents=False)
         
-        if self.verbose:
-            print(f"Generated README: {target_path}")
+        self._vlog(f"Generated README: {target_path}")
 
     def _initialize_git(self):
         """Initialize a git repository if git is available."""
+        self._vlog("Initializing Git repository...")
+        
+        message = f"Initial commit for {self.service_name} service"
         try:
-            # Check if git is available
-            subprocess.run(
-                ["git", "--version"], 
-                check=True, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE
-            )
-            
-            if self.verbose:
-                print("Initializing Git repository...")
+            if HAS_DULWICH:
+                # Create the repository in-process instead of spawning git
+                with porcelain.init(self._service_dir_str) as repo:
+                    porcelain.add(repo, paths=[self._service_dir_str])
+                    porcelain.commit(repo, message=message)
+            else:
+                commands = [
+                    ["git", "init", "-q"],
+                    ["git", "add", "-A"],
+                    ["git", "commit", "-q", "-m", message],
+                ]
+                if shutil.which("sh"):
+                    # Chain the commands in a single shell so only one process is spawned
+                    commands = [["sh", "-c", " && ".join(shlex.join(command) for command in commands)]]
                 
-            # Change directory to service directory
-            cwd = os.getcwd()
-            os.chdir(self.service_dir)
+                for command in commands:
+                    subprocess.run(
+                        command,
+                        cwd=self.service_dir,
+                        check=True,
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.PIPE,
+                        text=True
+                    )
             
-            try:
-                # Initialize git repository
-                subprocess.run(["git", "init"], check=True)
-                subprocess.run(["git", "add", "."], check=True)
-                subprocess.run(
-                    ["git", "commit", "-m", f"Initial commit for {self.service_name} service"],
-                    check=True
-                )
-                
-                if self.verbose:
-                    print("Git repository initialized successfully")
-            finally:
-                # Change back to original directory
-                os.chdir(cwd)
-        except subprocess.CalledProcessError:
-            print("Git not found or error initializing repository. Skipping git initialization.")
+            self._vlog("Git repository initialized successfully")
+        except FileNotFoundError:
+            self._flush_log()
+            print("Git not found. Skipping git initialization.")
+        except subprocess.CalledProcessError as e:
+            self._flush_log()
+            print(f"Error initializing git repository: {(e.stderr or '').strip() or e}")
+            print("Skipping git initialization.")
         except Exception as e:
+            self._flush_log()
             print(f"Error initializing git repository: {e}")
+        
+        self._flush_log()
+
+    def _vlog(self, message: str) -> None:
+        """Queue a verbose message to be written at the end of the current phase."""
+        if self.verbose:
+            self._log.append(message + "\n")
+
+    def _flush_log(self) -> None:
+        """Write all queued verbose messages with a single write call."""
+        if self._log:
+            sys.stdout.write("".join(self._log))
+            self._log.clear()
 
     def print_next_steps(self):
         """Print the next steps for the user."""
@@ -8,11 +8,15 @@ following the established architectural patterns.
 
 import argparse
 import os
+import re
 import sys
 from pathlib import Path
 
 from generator import MicroserviceGenerator
 
+# Alphanumeric characters and hyphens, starting with an alphanumeric character
+_NAME_RE = re.compile(r'\A[A-Za-z0-9][A-Za-z0-9-]*\Z').match
+
 
 def parse_args():
     """Parse command line arguments."""
@@ -48,17 +52,22 @@ def main():
     args = parse_args()
     
     # Validate service name (no spaces, valid directory name)
-    if not args.service_name.isalnum() and not all(c.isalnum() or c == '-' for c in args.service_name):
+    if not _NAME_RE(args.service_name):
         print(f"Error: Service name '{args.service_name}' contains invalid characters")
         print("Service name should only contain alphanumeric characters and hyphens")
         sys.exit(1)
     
+    # The default output directory is the working directory, so skip resolving it
+    output_path = Path(os.getcwd()) if args.output_dir == "." else Path(args.output_dir).resolve()
+    
     # Create output directory if it doesn't exist
-    output_path = Path(args.output_dir).resolve()
-    if not output_path.exists():
+    try:
+        os.makedirs(output_path)
+    except FileExistsError:
+        pass
+    else:
         if args.verbose:
-            print(f"Creating output directory: {output_path}")
-        os.makedirs(output_path, exist_ok=True)
+            print(f"Created output directory: {output_path}")
     
     # Initialize the generator
     generator = MicroserviceGenerator(
@@ -5,83 +5,456 @@ This module provides functions for working with files and directories,
 including template rendering and file system operations.
 """
 
+import errno
+import hashlib
 import os
+import re
+import shutil
+import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, List, Mapping, Optional, Tuple, Union
+
+from utils import _templates
+from utils._templates import TEMPLATES
 
 # Jinja2 is used for template rendering
 try:
-    from jinja2 import Environment, FileSystemLoader, Template
+    import jinja2
+    from jinja2 import BaseLoader, DictLoader, Environment, FileSystemLoader, Template
+    from jinja2.bccache import FileSystemBytecodeCache
     HAS_JINJA2 = True
 except ImportError:
     HAS_JINJA2 = False
 
+# liburing is used for batched io_uring writes on Linux
+try:
+    import liburing
+    HAS_LIBURING = sys.platform.startswith('linux')
+except ImportError:
+    HAS_LIBURING = False
+
+# Directory the bundled TEMPLATES were built from
+BUNDLED_TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+# When the bundle was last built, to detect templates edited since then
+_BUNDLE_MTIME_NS = os.stat(_templates.__file__).st_mtime_ns
+
+# Options every Jinja2 environment is built with; they also key the bytecode cache
+_ENV_OPTIONS = {
+    "trim_blocks": True,
+    "lstrip_blocks": True,
+    "keep_trailing_newline": True,
+}
+
+# Placeholders in the form {{variable_name}} or {{ variable_name }}
+_PLACEHOLDER_RE = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+
+@lru_cache(maxsize=None)
+def _get_bytecode_cache() -> Optional["FileSystemBytecodeCache"]:
+    """
+    Get the on-disk cache of compiled template bytecode.
+    
+    The first run compiles each template and stores its bytecode; later runs
+    load the bytecode instead of parsing and compiling the template again.
+    
+    Returns:
+        The bytecode cache, or None if the cache directory is unavailable
+    """
+    try:
+        cache_dir = _bytecode_cache_dir()
+        ensure_directory(cache_dir)
+    except (OSError, RuntimeError):
+        # The cache is optional; e.g. Path.home() fails without a home directory
+        return None
+    
+    if not os.access(cache_dir, os.W_OK):
+        return None
+    
+    return FileSystemBytecodeCache(str(cache_dir))
+
+
+def _bytecode_cache_dir() -> Path:
+    """
+    Get the directory for compiled template bytecode.
+    
+    The directory lives in the user's cache directory rather than the package
+    tree, and its name fingerprints the Jinja2 version and environment options
+    so bytecode compiled under different settings is never reused.
+    
+    Returns:
+        The bytecode cache directory
+    """
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or Path.home() / 'AppData' / 'Local'
+    elif sys.platform == 'darwin':
+        base = Path.home() / 'Library' / 'Caches'
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    
+    options = repr((jinja2.__version__, sorted(_ENV_OPTIONS.items())))
+    fingerprint = hashlib.sha1(options.encode('utf-8')).hexdigest()[:12]
+    return Path(base) / 'bun-baker' / f'jinja-{fingerprint}'
+
+
+def _make_env(loader: "BaseLoader") -> "Environment":
+    """
+    Build a Jinja2 environment with the generator's rendering options.
+    
+    Args:
+        loader: The loader the environment reads templates from
+        
+    Returns:
+        The new Jinja2 environment
+    """
+    return Environment(
+        loader=loader,
+        auto_reload=False,
+        cache_size=-1,
+        bytecode_cache=_get_bytecode_cache(),
+        **_ENV_OPTIONS
+    )
+
 
-def ensure_directory(directory_path: Path) -> None:
+@lru_cache(maxsize=None)
+def _get_env(template_dir: str) -> "Environment":
+    """
+    Get the shared Jinja2 environment for a template directory.
+    
+    The environment is built once per directory so that Jinja2's template
+    cache is reused across renders instead of re-parsing every template.
+    
+    Args:
+        template_dir: The directory containing the templates
+        
+    Returns:
+        The cached Jinja2 environment for the directory
+    """
+    return _make_env(FileSystemLoader(template_dir))
+
+
+@lru_cache(maxsize=None)
+def _get_bundled_env() -> "Environment":
+    """
+    Get the shared Jinja2 environment serving the bundled templates from memory.
+    
+    Returns:
+        The cached Jinja2 environment for the bundled templates
+    """
+    return _make_env(DictLoader(TEMPLATES))
+
+
+def ensure_directory(directory_path: Union[str, Path]) -> None:
     """
     Ensure a directory exists, creating it if necessary.
     
     Args:
         directory_path: The path to the directory to ensure exists
     """
-    directory_path.mkdir(parents=True, exist_ok=True)
+    os.makedirs(directory_path, exist_ok=True)
 
 
-def write_file(file_path: Path, content: str) -> None:
+def _ensure_parent(file_path: Union[str, Path]) -> None:
+    """
+    Ensure the parent directory of a file exists.
+    
+    Args:
+        file_path: The path of the file whose parent should exist
+    """
+    parent = os.path.dirname(file_path)
+    if parent:
+        ensure_directory(parent)
+
+
+def write_file(file_path: Union[str, Path], content: str, /, create_parents: bool = True) -> None:
     """
     Write content to a file, creating parent directories if needed.
     
     Args:
         file_path: The path to the file to write
         content: The content to write to the file
+        create_parents: Whether to create missing parent directories
+    """
+    write_file_bytes(file_path, content.encode('utf-8'), create_parents)
+
+
+def write_file_bytes(file_path: Union[str, Path], content: bytes, /, create_parents: bool = True) -> None:
+    """
+    Write already-encoded content to a file, creating parent directories if needed.
+    
+    The content is written as-is, without any encoding or newline translation.
+    
+    Args:
+        file_path: The path to the file to write
+        content: The bytes to write to the file
+        create_parents: Whether to create missing parent directories
     """
     # Ensure the directory exists
-    ensure_directory(file_path.parent)
+    if create_parents:
+        _ensure_parent(file_path)
     
     # Write the content to the file
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(content)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
 
 
-def render_template(template_path: Path, variables: Dict[str, Any]) -> str:
+class UringBatchWriter:
     """
-    Render a template with the given variables.
+    Write many files with a single io_uring submission.
+    
+    Every file is opened up front, one write request is queued per file and
+    the whole batch is submitted together, so the kernel sees one submit
+    instead of one write syscall per file.
+    """
+
+    def __init__(self, entries: int = 32):
+        """
+        Set up the io_uring instance.
+        
+        Args:
+            entries: The size of the submission queue
+            
+        Raises:
+            OSError: If the kernel refuses to create the ring
+        """
+        self.entries = entries
+        self.ring = liburing.Ring()
+        self.cqe = liburing.Cqe()
+        liburing.io_uring_queue_init(entries, self.ring)
+
+    def close(self) -> None:
+        """Tear down the io_uring instance."""
+        liburing.io_uring_queue_exit(self.ring)
+
+    def __enter__(self) -> "UringBatchWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def write_all(self, files: List[Tuple[Union[str, Path], bytes]], create_parents: bool = True) -> None:
+        """
+        Write every (path, content) pair, creating parent directories if needed.
+        
+        Args:
+            files: The files to write and their encoded contents
+            create_parents: Whether to create missing parent directories
+            
+        Raises:
+            OSError: For the first file, in order, that could not be written;
+                every file before it has been written
+        """
+        for start in range(0, len(files), self.entries):
+            self._write_batch(files[start:start + self.entries], create_parents)
+
+    def _write_batch(self, files: List[Tuple[Union[str, Path], bytes]], create_parents: bool) -> None:
+        fds = []
+        # Errors by position in the batch, so the first one in order is raised
+        errors = {}
+        try:
+            # Open every file before queueing, so a failed open never leaves
+            # queued writes behind in the ring; files before it are still written
+            for file_path, _ in files:
+                try:
+                    if create_parents:
+                        _ensure_parent(file_path)
+                    fds.append(os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644))
+                except OSError as e:
+                    errors[len(fds)] = e
+                    break
+            
+            for index, (fd, (_, content)) in enumerate(zip(fds, files)):
+                sqe = liburing.io_uring_get_sqe(self.ring)
+                liburing.io_uring_prep_write(sqe, fd, content, 0)
+                liburing.io_uring_sqe_set_data64(sqe, index)
+            
+            # Older kernels stop submitting at the first request that fails to
+            # initialise, so keep submitting until everything is in flight
+            submitted = 0
+            while submitted < len(fds):
+                count = liburing.io_uring_submit(self.ring)
+                if not count:
+                    break
+                submitted += count
+            
+            if submitted < len(fds):
+                # Requests are submitted in order, so everything from here on is unwritten
+                errors[submitted] = OSError(
+                    errno.EIO,
+                    f"io_uring accepted only {submitted} of {len(fds)} writes",
+                    str(files[submitted][0])
+                )
+            
+            # Reap every completion before raising so no write is left in flight
+            for _ in range(submitted):
+                liburing.io_uring_wait_cqe(self.ring, self.cqe)
+                cqe = self.cqe[0]
+                index = liburing.io_uring_cqe_get_data64(cqe)
+                try:
+                    # The bindings raise the completion's error when reading res
+                    res = cqe.res
+                except OSError as e:
+                    res = -e.errno
+                liburing.io_uring_cqe_seen(self.ring, cqe)
+                
+                file_path, content = files[index]
+                if res < 0:
+                    errors[index] = OSError(-res, os.strerror(-res), str(file_path))
+                elif res < len(content):
+                    # Finish a short write synchronously
+                    view = memoryview(content)
+                    while res < len(content):
+                        res += os.pwrite(fds[index], view[res:], res)
+            
+            if errors:
+                raise errors[min(errors)]
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+
+class _PlaceholderTemplate:
+    """Minimal stand-in for a Jinja2 template when Jinja2 is not installed."""
+
+    def __init__(self, source: str):
+        self.source = source
+
+    def render(self, variables: Mapping[str, Any]) -> str:
+        replacements = {key: str(value) for key, value in variables.items()}
+        
+        # Replace every known placeholder in a single pass, leaving unknown ones as-is
+        return _PLACEHOLDER_RE.sub(
+            lambda match: replacements.get(match.group(1), match.group(0)),
+            self.source
+        )
+
+
+@lru_cache(maxsize=128)
+def _read_template(template_path: str, mtime_ns: int) -> str:
+    """
+    Read a template's source, cached until the file is modified.
     
     Args:
         template_path: Path to the template file
-        variables: Dictionary of variables to use in the template
+        mtime_ns: The file's modification time, used to invalidate the cache
         
     Returns:
-        The rendered template as a string
+        The template source
+    """
+    with open(template_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _is_bundled(template_path: Path) -> bool:
+    """
+    Check whether a template can be served from the bundled TEMPLATES.
+    
+    A template edited after the bundle was built is read from disk instead,
+    so a forgotten rebuild never ships stale content.
+    
+    Args:
+        template_path: Path to the template file
+        
+    Returns:
+        True if the bundled copy is current for this template
+    """
+    if template_path.parent != BUNDLED_TEMPLATE_DIR or template_path.name not in TEMPLATES:
+        return False
+    
+    try:
+        return template_path.stat().st_mtime_ns <= _BUNDLE_MTIME_NS
+    except FileNotFoundError:
+        # Only the bundled copy is left
+        return True
+
+
+def load_template(template_path: Path) -> "Template":
+    """
+    Load and compile a template so it can be rendered repeatedly.
+    
+    Args:
+        template_path: Path to the template file
+        
+    Returns:
+        A template object exposing a ``render(variables)`` method
         
     Raises:
         FileNotFoundError: If the template file does not exist
-        ImportError: If Jinja2 is not installed
-        Exception: If there is an error rendering the template
     """
+    if _is_bundled(template_path):
+        # Serve the templates shipped with the generator straight from memory
+        if HAS_JINJA2:
+            return _get_bundled_env().get_template(template_path.name)
+        return _PlaceholderTemplate(TEMPLATES[template_path.name])
+    
     if not template_path.exists():
         raise FileNotFoundError(f"Template not found: {template_path}")
     
     if HAS_JINJA2:
         # Use Jinja2 for template rendering if available
-        env = Environment(
-            loader=FileSystemLoader(str(template_path.parent)),
-            trim_blocks=True,
-            lstrip_blocks=True,
-            keep_trailing_newline=True
-        )
-        template = env.get_template(template_path.name)
-        return template.render(**variables)
+        env = _get_env(str(template_path.parent))
+        return env.get_template(template_path.name)
     else:
         # Fallback to basic string replacement if Jinja2 is not available
-        with open(template_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        # Replace placeholders in the form {{variable_name}}
-        for key, value in variables.items():
-            content = content.replace('{{' + key + '}}', str(value))
-            
-        return content
+        source = _read_template(str(template_path), template_path.stat().st_mtime_ns)
+        return _PlaceholderTemplate(source)
+
+
+def write_files(files: List[Tuple[Union[str, Path], bytes]], create_parents: bool = True) -> None:
+    """
+    Write several files, batching the writes through io_uring when available.
+    
+    Args:
+        files: The files to write, as (path, encoded content) pairs
+        create_parents: Whether to create missing parent directories
+        
+    Raises:
+        OSError: For the first file, in order, that could not be written;
+            every file before it has been written
+    """
+    if HAS_LIBURING:
+        try:
+            writer = UringBatchWriter()
+        except OSError:
+            # io_uring may be disabled by the kernel or a sandbox
+            pass
+        else:
+            with writer:
+                writer.write_all(files, create_parents)
+            return
+    
+    for file_path, content in files:
+        try:
+            write_file_bytes(file_path, content, create_parents)
+        except OSError as e:
+            # os.write errors don't name the file; make every error identify it
+            if e.filename is None:
+                e.filename = str(file_path)
+            raise
+
+
+def render_template(template_path: Path, variables: Mapping[str, Any], /) -> str:
+    """
+    Render a template with the given variables.
+    
+    Args:
+        template_path: Path to the template file
+        variables: Dictionary of variables to use in the template
+        
+    Returns:
+        The rendered template as a string
+        
+    Raises:
+        FileNotFoundError: If the template file does not exist
+        Exception: If there is an error rendering the template
+    """
+    return load_template(template_path).render(variables)
 
 
 def copy_file(source_path: Path, destination_path: Path) -> None:
@@ -103,4 +476,18 @@ def copy_file(source_path: Path, destination_path: Path) -> None:
     
     # Copy the file
     with open(source_path, 'rb') as src, open(destination_path, 'wb') as dst:
-        dst.write(src.read()) 
\ No newline at end of file
+        try:
+            # Let the kernel copy the data without passing it through Python
+            size = os.fstat(src.fileno()).st_size
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(dst.fileno(), src.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except (AttributeError, OSError):
+            # sendfile is unavailable or unsupported for these files
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+            shutil.copyfileobj(src, dst, 1 << 20) 
\ No newline at end of file